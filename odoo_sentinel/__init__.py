@@ -5,16 +5,16 @@
 import argparse
 import curses.ascii
 import gettext
-import math
 import locale
 import odoorpc
 import os
 import sys
 import textwrap
+import time
 import traceback
 
+from concurrent.futures import ThreadPoolExecutor, wait
 from datetime import datetime
-from functools import reduce
 
 from halo import Halo
 # from playsound import playsound
@@ -29,6 +29,17 @@ I18N_DEFAULT = 'en_US'
 
 NULL_CHAR = '\0'
 
+# Maximum number of consecutive menu redraws skipped while keys are waiting
+MAX_SKIPPED_REDRAWS = 32
+# Keys pressed within this interval (in seconds) are part of a burst
+KEY_BURST_INTERVAL = 0.05
+# Time to wait (in milliseconds) for the next key of a burst before a redraw
+KEY_BURST_DELAY = 8
+# Time without resize events (in milliseconds) before resizing a menu
+RESIZE_DEBOUNCE_DELAY = 50
+# Maximum number of menu rows held in a pad, below the curses lines limit
+MAX_PAD_ROWS = 32000
+
 
 # _ will be initialized by gettext.install but declared to prevent pep8 issues
 _ = None
@@ -45,6 +56,11 @@ COLOR_NAMES = {
     'yellow': curses.COLOR_YELLOW,
 }
 
+# Display modifier of the highlighted texts (titles, selected entries)
+HIGHLIGHT = curses.A_REVERSE | curses.A_BOLD
+# Mouse event validating the clicked entry
+DOUBLE_CLICK = curses.BUTTON1_DOUBLE_CLICKED
+
 # Pre-defined color pairs
 COLOR_PAIRS = {
     'base': (1, 'white', 'blue'),
@@ -60,6 +76,20 @@ class Sentinel(object):
     Manages scanner terminals
     """
 
+    # Fixed attributes, for faster access from the key press loops
+    __slots__ = (
+        'audio_file', 'auto_resize', 'connection', 'hardware_code',
+        'log_file', 'scenario_id', 'scenario_name', 'screen', 'test_file',
+        'window_height', 'window_width',
+        '_color_cache', '_confirm_layout', '_dispatch', '_executor',
+        '_key_gap', '_last_key_time', '_last_menu_entries',
+        '_last_menu_layout', '_last_menu_position', '_log_fh', '_menu_lines',
+        '_menu_middle', '_menu_scroll_middle', '_pad', '_pad_column',
+        '_pad_first', '_pad_highlighted', '_pad_key', '_pad_rows', '_t',
+        '_test_buf', '_test_pos', '_tr', '_wrap_cache', '_wrap_geom',
+        '_wrapper',
+    )
+
     def __init__(self, stdscr, options):
         """
         Initialize the sentinel program
@@ -73,11 +103,27 @@ class Sentinel(object):
                 '{options.config_file}!'
                 .format(options=options))
 
+        # Server calls are executed in a separate thread, to keep handling
+        # the terminal events while waiting for the answer
+        # A single worker ensures that calls never overlap on the connection
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        # Time of the last key press, and time elapsed since the previous
+        # one, to detect bursts of keys
+        self._last_key_time = 0
+        self._key_gap = KEY_BURST_INTERVAL
+
         self.log_file = os.path.expanduser(options.log_file)
+        # The log file is opened on the first error, then kept open, line
+        # buffered, for the whole session
+        self._log_fh = None
         self.audio_file = os.path.expanduser(options.audio_file)
         self.test_file = None
         if options.test_file:
-            self.test_file = open(os.path.expanduser(options.test_file), 'r')
+            # Load the whole test file, keys are then read from memory
+            self.test_file = os.path.expanduser(options.test_file)
+            with open(self.test_file, 'r') as test_file:
+                self._test_buf = test_file.read()
+            self._test_pos = 0
 
         # Initialize translations
         lang = self.connection.env.context.get('lang', I18N_DEFAULT)
@@ -89,16 +135,59 @@ class Sentinel(object):
             language = gettext.translation(
                 I18N_DOMAIN, I18N_DIR, languages=[I18N_DEFAULT])
 
-        # Replace global dummy lambda by the translations gettext method
+        # Copy the loaded catalog in a plain dict, to translate each message
+        # with a single lookup
+        self._tr = dict(language._catalog)
+
+        # Replace global dummy lambda by a lookup in the translations catalog
         # The install method of gettext doesn't replace the function if exists
         global _
-        _ = language.gettext
+
+        def _(message, catalog=self._tr):
+            return catalog.get(message, message)
+
+        # Translate the messages used in the display loops only once
+        self._t = {
+            'yes': _('Yes'),
+            'no': _('No'),
+            'selected': _('Selected : %s'),
+            'selected_index': _('Selected : %d'),
+            'scenarios': _('Scenarios'),
+            'no_value': _('No value available'),
+            'no_scenario': _('No scenario available !'),
+            'error': _('An error occured\n\nPlease contact your '
+                       'administrator'),
+            'autoconf': _('Autoconfiguration failed !\n'
+                          'Please enter terminal code'),
+        }
 
         # Initialize window
         self.screen = stdscr
+        # Never refresh on each write, the screen is updated before each key
+        self.screen.immedok(False)
         self.auto_resize = False
         self.window_width = 18
         self.window_height = 6
+        # Yes/No layout of the confirmation screen, computed for a given width
+        self._confirm_layout = None
+        # Text wrapper used by scrolled displays, and its width
+        self._wrapper = None
+        self._wrap_geom = None
+        # Last wrapped text, with its lines as text and encoded
+        self._wrap_cache = None
+        # Last displayed menu, to only update the scroll position if possible
+        self._last_menu_entries = None
+        self._last_menu_layout = None
+        self._last_menu_position = None
+        # Pad containing the menu rows, what it was allocated for, the
+        # horizontal position and first entry of its rows, its rendered rows
+        # and its highlighted row
+        self._pad = None
+        self._pad_key = None
+        self._pad_column = None
+        self._pad_first = 0
+        self._pad_rows = set()
+        self._pad_highlighted = None
         # Store the initial screen size before resizing it
         initial_screen_size = self.screen.getmaxyx()
         self._set_screen_size()
@@ -118,9 +207,7 @@ class Sentinel(object):
                 self.hardware_code = os.environ['ODOO_SENTINEL_CODE']
                 self.scanner_check()
             except Exception:
-                self.hardware_code = self._input_text(
-                    _('Autoconfiguration failed !\nPlease enter terminal code')
-                )
+                self.hardware_code = self._input_text(self._t['autoconf'])
                 self.scanner_check()
 
         # Reinit colors with values configured in OpenERP
@@ -136,8 +223,26 @@ class Sentinel(object):
         if self.test_file:
             self.oerp_call('end')
 
+        # Handlers of the steps, by step type
+        self._dispatch = {
+            'Q': self._handle_quantity,
+            'N': self._handle_quantity,
+            'C': self._handle_confirm,
+            'T': self._handle_text,
+            'R': self._handle_critical_error,
+            'U': self._handle_unknown,
+            'E': self._handle_error,
+            'M': self._handle_message,
+            'L': self._handle_list,
+            'F': self._handle_end,
+        }
+
         # Load the sentinel
-        self.main_loop()
+        try:
+            self.main_loop()
+        finally:
+            if self._log_fh is not None:
+                self._log_fh.close()
 
     def scanner_check(self):
         self.scenario_id = self.connection.env[
@@ -171,6 +276,11 @@ class Sentinel(object):
             curses.init_pair(
                 the_id, COLOR_NAMES[front_color], COLOR_NAMES[back_color])
 
+        # Store the codes of the color pairs
+        self._color_cache = {
+            name: curses.color_pair(pair[0])
+            for name, pair in COLOR_PAIRS.items()}
+
         # Set the default background color
         self.screen.bkgd(0, self._get_color('base'))
 
@@ -195,29 +305,67 @@ class Sentinel(object):
 
         self.screen.resize(self.window_height, self.window_width)
 
+        # Store the menus geometry, which only changes with the screen size
+        nb_lines = self.window_height - 1
+        self._menu_lines = nb_lines
+        self._menu_middle = nb_lines // 2
+        # For menus taller than the screen, the last line shows the arrow
+        self._menu_scroll_middle = (nb_lines - 2) // 2
+
     def _get_color(self, name):
         """
         Get a curses color's code
         """
-        return curses.color_pair(COLOR_PAIRS[name][0])
+        return self._color_cache[name]
 
     def _read_from_file(self):
         """
         Emulates the getkey method of curses, reading from the supplied test
         file
         """
-        key = self.test_file.read(1)
+        key = self._test_buf[self._test_pos:self._test_pos + 1]
+        self._test_pos += len(key)
         if key == ':':
-            # Truncate the trailing "new line" character
-            key = self.test_file.readline()[:-1]
+            # Read until the end of the line, without the "new line" character
+            end = self._test_buf.find('\n', self._test_pos)
+            if end == -1:
+                end = len(self._test_buf)
+            key = self._test_buf[self._test_pos:end]
+            self._test_pos = end + 1
 
         # End of file reached, terminate the sentinel
         if not key:
-            self.test_file.close()
             exit(0)
 
         return key
 
+    def _has_pending_key(self, delay=None):
+        """
+        Checks if a key is waiting in the keyboard buffer, waiting at most
+        delay milliseconds for it
+        By default, when the last key followed closely the previous one, waits
+        a few milliseconds for the next key of the burst (key repeat, paste,
+        barcode scan), otherwise doesn't wait at all
+        """
+        if self.test_file:
+            return False
+
+        if delay is None:
+            delay = 0
+            if self._key_gap < KEY_BURST_INTERVAL:
+                delay = KEY_BURST_DELAY
+        self.screen.timeout(delay)
+        try:
+            key = self.screen.getch()
+        finally:
+            self.screen.timeout(-1)
+        if key == -1:
+            return False
+
+        # Put the key back, it will be read by the next getkey call
+        self.ungetch(key)
+        return True
+
     def ungetch(self, value):
         """
         Put a value in the keyboard buffer
@@ -237,6 +385,9 @@ class Sentinel(object):
                 key = self.screen.getkey()
             except Exception:
                 key = None
+            now = time.monotonic()
+            self._key_gap = now - self._last_key_time
+            self._last_key_time = now
         if key == '':
             # Escape key : Return back to the previous step
             raise SentinelBackException('Back')
@@ -250,8 +401,10 @@ class Sentinel(object):
         """
 
         # Clear the sceen if needed
+        # erase() lets curses send only the changed cells on the next
+        # refresh, where clear() would force a repaint of the whole terminal
         if clear:
-            self.screen.clear()
+            self.screen.erase()
 
         # Display the title, if any
         if title is not None:
@@ -259,7 +412,7 @@ class Sentinel(object):
             title = title.center(self.window_width)
             self._display(
                 title, color='info',
-                modifier=curses.A_REVERSE | curses.A_BOLD)
+                modifier=HIGHLIGHT)
 
         # Compute the display modifiers
         color = self._get_color(color) | modifier
@@ -271,56 +424,80 @@ class Sentinel(object):
         if not scroll:
             self.screen.addstr(y, x, text.encode(encoding), color)
         else:
-            # Wrap the text to avoid splitting words
-            text_lines = []
-            for line in text.splitlines():
-                text_lines.extend(
-                    textwrap.wrap(line, self.window_width - x - 1) or [''])
+            # Reuse the text wrapper while the available width is unchanged
+            geom = (self.window_width - x - 1,)
+            if self._wrap_geom != geom:
+                self._wrapper = textwrap.TextWrapper(width=geom[0])
+                self._wrap_geom = geom
+
+            # The same message is displayed again on each key press of the
+            # input screens, reuse its lines if it was the last one wrapped
+            if (self._wrap_cache is not None and
+                    self._wrap_cache[0] == (text, geom)):
+                (text_lines, lines_b) = self._wrap_cache[1:]
+            else:
+                # Wrap the text to avoid splitting words
+                text_lines = []
+                wrap = self._wrapper.wrap
+                for line in text.splitlines():
+                    text_lines.extend(wrap(line) or [''])
+                # Encode the lines once, they don't change while scrolling
+                lines_b = [line.encode(encoding) for line in text_lines]
+                self._wrap_cache = ((text, geom), text_lines, lines_b)
 
             # Initialize variables
             first_line = 0
             if height is None:
                 height = self.window_height
 
-            (cursor_y, cursor_x) = cursor or (
-                self.window_height - 1, self.window_width - 1)
+            # Bind the values used on each key press to local names
+            addstr = self.screen.addstr
+            addch = self.screen.addch
+            getkey = self.getkey
+            win_w = self.window_width
+            win_h = self.window_height
+
+            (cursor_y, cursor_x) = cursor or (win_h - 1, win_w - 1)
+
+            # Compute the values which don't depend on the scrolling
+            n_lines = len(text_lines)
+            scroll_height = n_lines - height
+            max_first_line = max(0, n_lines - height + 1)
+            arrow_y = min(height + y - 1, win_h - 2)
+            blank_line = (win_w - x - 1) * ' '
 
             while True:
                 # Display the menu
-                self.screen.addstr(height - 1, x,
-                                   (self.window_width - x - 1) * ' ', color)
-                text = text_lines[first_line:first_line + height - y]
-                self.screen.addstr(
-                    y, x, '\n'.join(text).encode(encoding),
-                    color)
+                addstr(height - 1, x, blank_line, color)
+                addstr(y, x,
+                       b'\n'.join(lines_b[first_line:first_line + height - y]),
+                       color)
 
                 # Display arrows
                 if first_line > 0:
-                    self.screen.addch(
-                        y, self.window_width - 1, curses.ACS_UARROW)
-                if first_line + height < len(text_lines):
-                    self.screen.addch(
-                        min(height + y - 1, self.window_height - 2),
-                        self.window_width - 1, curses.ACS_DARROW)
+                    addch(y, win_w - 1, curses.ACS_UARROW)
+                if first_line + height < n_lines:
+                    addch(arrow_y, win_w - 1, curses.ACS_DARROW)
                 else:
-                    self.screen.addch(
-                        min(height + y - 1, self.window_height - 2),
-                        self.window_width - 1, ' ')
+                    addch(arrow_y, win_w - 1, ' ')
 
                 # Set the cursor position
-                if height < len(text_lines):
-                    scroll_height = len(text_lines) - height
-                    position_percent = float(first_line) / scroll_height
+                if scroll_height > 0:
                     position = y + min(
-                        int(round((height - 1) * position_percent)),
-                        self.window_height - 2)
+                        ((height - 1) * first_line + scroll_height // 2) //
+                        scroll_height,
+                        win_h - 2)
                     self._display(
-                        ' ', x=self.window_width - 1, y=position - 1,
+                        ' ', x=win_w - 1, y=position - 1,
                         color='info', modifier=curses.A_REVERSE)
                 self.screen.move(cursor_y, cursor_x)
 
+                # Send all the changes to the terminal in a single update
+                self.screen.noutrefresh()
+                curses.doupdate()
+
                 # Get the pushed key
-                key = self.getkey()
+                key = getkey()
 
                 if key == 'KEY_DOWN':
                     # Down key : Go down in the list
@@ -333,8 +510,7 @@ class Sentinel(object):
                     return key
 
                 # Avoid going out of the list
-                first_line = min(
-                    max(0, first_line), max(0, len(text_lines) - height + 1))
+                first_line = min(max(0, first_line), max_first_line)
 
     def main_loop(self):
         """
@@ -356,8 +532,11 @@ class Sentinel(object):
                         beep = False
                         title_key = '|'
                         beep_key = '^'
+                        no_result = (
+                            result is None or result is True or
+                            result is False)
 
-                        if isinstance(result, (type(None), bool)):
+                        if no_result:
                             pass
                         elif (isinstance(result, dict) and
                               result.get(beep_key, None)):
@@ -372,7 +551,7 @@ class Sentinel(object):
                             beep = True
                             result.pop()
 
-                        if isinstance(result, (type(None), bool)):
+                        if no_result:
                             pass
                         elif (isinstance(result, dict) and
                               result.get(title_key, None)):
@@ -392,98 +571,15 @@ class Sentinel(object):
                             try:
                                 # Play an audio file
                                 # playsound(self.audio_file)
-                                os.system("echo -e '\a'")
-                            except:
+                                curses.beep()
+                            except curses.error:
                                 pass
 
-                        if code == 'Q' or code == 'N':
-                            # Quantity selection
-                            quantity = self._select_quantity(
-                                '\n'.join(result), '%g' % value,
-                                integer=(code == 'N'), title=title)
-                            (code, result, value) = self.oerp_call('action',
-                                                                   quantity)
-                        elif code == 'C':
-                            # Confirmation query
-                            confirm = self._confirm(
-                                '\n'.join(result), title=title)
-                            (code, result, value) = self.oerp_call('action',
-                                                                   confirm)
-                        elif code == 'T':
-                            # Select arguments from value
-                            default = ''
-                            size = None
-                            if isinstance(value, dict):
-                                default = value.get('default', '')
-                                size = value.get('size', None)
-                            elif isinstance(value, str):
-                                default = value
-                            # Text input
-                            text = self._input_text(
-                                '\n'.join(result), default=default,
-                                size=size, title=title)
-                            (code, result, value) = self.oerp_call('action',
-                                                                   text)
-                        elif code == 'R':
-                            # Critical error
-                            self.scenario_id = False
-                            self.scenario_name = False
-                            self._display_error('\n'.join(result), title=title)
-                        elif code == 'U':
-                            # Unknown action : message with return back to the
-                            # last state
-                            self._display_message(
-                                '\n'.join(result), clear=True, scroll=True,
-                                title=title)
-                            (code, result, value) = self.oerp_call('back')
-                        elif code == 'E':
-                            # Error message
-                            self._display_error(
-                                '\n'.join(result), title=title)
-                            # Execute transition
-                            if not value:
-                                (code, result, value) = self.oerp_call(
-                                    'action')
-                            else:
-                                # Back to the previous step required
-                                (code, result, value) = self.oerp_call(
-                                    'back')
-                        elif code == 'M':
-                            # Simple message
-                            self._display_message(
-                                '\n'.join(result), clear=True, scroll=True,
-                                title=title)
-                            # Execute transition
-                            (code, result, value) = self.oerp_call('action',
-                                                                   value)
-                        elif code == 'L':
-                            if result:
-                                # Select a value in the list
-                                choice = self._menu_choice(result, title=title)
-                                # Send the result to Odoo
-                                (code, result, value) = self.oerp_call(
-                                    'action', choice)
-                            else:
-                                # Empty list supplied, display an error
-                                (code, result, value) = (
-                                    'E', [_('No value available')], True)
-
-                            # Check if we are in a scenario (to retrieve the
-                            # scenario name from a submenu)
-                            self.scanner_check()
-                            if not self.scenario_id:
-                                self.scenario_id = True
-                                self.scenario_name = False
-                        elif code == 'F':
-                            # End of scenario
-                            self.scenario_id = False
-                            self.scenario_name = False
-                            self._display_message(
-                                '\n'.join(result), clear=True, scroll=True,
-                                title=title)
-                        else:
-                            # Default call
-                            (code, result, value) = self.oerp_call('restart')
+                        # Execute the step
+                        handler = self._dispatch.get(
+                            code, self._handle_default)
+                        (code, result, value) = handler(
+                            code, result, value, title)
                 except SentinelBackException:
                     # Back to the previous step required
                     (code, result, value) = self.oerp_call('back')
@@ -493,41 +589,142 @@ class Sentinel(object):
                     self.screen.bkgd(0, self._get_color('base'))
                 except Exception:
                     # Generates log contents
-                    log_contents = """%s
-# %s
-# Hardware code : %s
-# ''Current scenario : %s (%s)
+                    separator = '#' * 79
+                    now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+                    trace = ''.join(
+                        traceback.format_exception(*sys.exc_info()))
+                    log_contents = f"""{separator}
+# {now}
+# Hardware code : {self.hardware_code}
+# ''Current scenario : {self.scenario_id} ({self.scenario_name})
 # Current values :
-#\tcode : %s
-#\tresult : %s
-#\tvalue : %s
-%s
-%s
+#\tcode : {code}
+#\tresult : {result!r}
+#\tvalue : {value!r}
+{separator}
+{trace}
 """
-                    log_contents = log_contents % (
-                        '#' * 79, datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                        self.hardware_code, str(self.scenario_id),
-                        self.scenario_name, code, repr(result), repr(value),
-                        '#' * 79, reduce(
-                            lambda x, y: x + y, traceback.format_exception(
-                                sys.exc_info()[0],
-                                sys.exc_info()[1],
-                                sys.exc_info()[2])))
 
                     # Writes traceback in log file
-                    with open(self.log_file, 'a') as log_file:
-                        log_file.write(log_contents)
+                    if self._log_fh is None:
+                        self._log_fh = open(self.log_file, 'a', buffering=1)
+                    self._log_fh.write(log_contents)
 
                     # Display error message
-                    (code, result, value) = (
-                        'E', [_('An error occured\n\nPlease contact your '
-                                'administrator')], False)
+                    (code, result, value) = ('E', [self._t['error']], False)
             except KeyboardInterrupt:
                 # If Ctrl+C, exit
                 (code, result, value) = self.oerp_call('end')
                 # Restore normal background colors
                 self.screen.bkgd(0, self._get_color('base'))
 
+    def _handle_quantity(self, code, result, value, title):
+        """
+        Quantity selection
+        """
+        quantity = self._select_quantity(
+            '\n'.join(result), f'{value:g}', integer=(code == 'N'),
+            title=title)
+        return self.oerp_call('action', quantity)
+
+    def _handle_confirm(self, code, result, value, title):
+        """
+        Confirmation query
+        """
+        confirm = self._confirm('\n'.join(result), title=title)
+        return self.oerp_call('action', confirm)
+
+    def _handle_text(self, code, result, value, title):
+        """
+        Text input
+        """
+        # Select arguments from value
+        default = ''
+        size = None
+        if isinstance(value, dict):
+            default = value.get('default', '')
+            size = value.get('size', None)
+        elif isinstance(value, str):
+            default = value
+        text = self._input_text(
+            '\n'.join(result), default=default, size=size, title=title)
+        return self.oerp_call('action', text)
+
+    def _handle_critical_error(self, code, result, value, title):
+        """
+        Critical error
+        """
+        self.scenario_id = False
+        self.scenario_name = False
+        self._display_error('\n'.join(result), title=title)
+        return (code, result, value)
+
+    def _handle_unknown(self, code, result, value, title):
+        """
+        Unknown action : message with return back to the last state
+        """
+        self._display_message(
+            '\n'.join(result), clear=True, scroll=True, title=title)
+        return self.oerp_call('back')
+
+    def _handle_error(self, code, result, value, title):
+        """
+        Error message
+        """
+        self._display_error('\n'.join(result), title=title)
+        # Execute transition
+        if not value:
+            return self.oerp_call('action')
+        # Back to the previous step required
+        return self.oerp_call('back')
+
+    def _handle_message(self, code, result, value, title):
+        """
+        Simple message
+        """
+        self._display_message(
+            '\n'.join(result), clear=True, scroll=True, title=title)
+        # Execute transition
+        return self.oerp_call('action', value)
+
+    def _handle_list(self, code, result, value, title):
+        """
+        Selection of a value in a list
+        """
+        if result:
+            # Select a value in the list
+            choice = self._menu_choice(result, title=title)
+            # Send the result to Odoo
+            ret = self.oerp_call('action', choice)
+        else:
+            # Empty list supplied, display an error
+            ret = ('E', [self._t['no_value']], True)
+
+        # Check if we are in a scenario (to retrieve the scenario name from a
+        # submenu)
+        self.scanner_check()
+        if not self.scenario_id:
+            self.scenario_id = True
+            self.scenario_name = False
+
+        return ret
+
+    def _handle_end(self, code, result, value, title):
+        """
+        End of scenario
+        """
+        self.scenario_id = False
+        self.scenario_name = False
+        self._display_message(
+            '\n'.join(result), clear=True, scroll=True, title=title)
+        return (code, result, value)
+
+    def _handle_default(self, code, result, value, title):
+        """
+        Default call
+        """
+        return self.oerp_call('restart')
+
     def _display_message(
             self, text='', x=0, y=0, clear=False, color='base', bgcolor=False,
             modifier=curses.A_NORMAL, cursor=None, height=None, scroll=False,
@@ -563,9 +760,37 @@ class Sentinel(object):
         """
         Calls a method from Odoo Server
         """
-        return self.connection.env['scanner.hardware'].scanner_call(
+        future = self._executor.submit(
+            self.connection.env['scanner.hardware'].scanner_call,
             self.hardware_code, action, message, 'keyboard')
 
+        # Handle the terminal resizes while waiting for the server
+        pending_keys = []
+        self.screen.nodelay(True)
+        try:
+            while not future.done():
+                key = self.screen.getch()
+                if key == curses.KEY_RESIZE:
+                    self._set_screen_size()
+                elif key != -1:
+                    # Keep the other keys for the next step
+                    pending_keys.append(key)
+                else:
+                    wait((future,), timeout=0.05)
+        finally:
+            self.screen.nodelay(False)
+
+        # Put back the keys pressed during the call, in their original order
+        for key in reversed(pending_keys):
+            self.ungetch(key)
+
+        # The spinner writes to the terminal behind curses' back, so the
+        # next refresh must repaint the whole screen
+        self.screen.clearok(True)
+        self._last_menu_entries = None
+
+        return future.result()
+
     def _select_scenario(self):
         """
         Selects a scenario from the server
@@ -575,10 +800,10 @@ class Sentinel(object):
 
         # If no scenario available : return an error
         if not values:
-            return ('R', [_('No scenario available !')], 0)
+            return ('R', [self._t['no_scenario']], 0)
 
         # Select a scenario in the list
-        choice = self._menu_choice(values, title=_('Scenarios'))
+        choice = self._menu_choice(values, title=self._t['scenarios'])
         ret = self.oerp_call('action', choice)
 
         # Store the scenario id and name
@@ -600,22 +825,28 @@ class Sentinel(object):
             # Clear the screen
             self._display(clear=True)
 
-            # Compute Yes/No positions
+            # Compute Yes/No positions, only when the width has changed
+            if (self._confirm_layout is None or
+                    self._confirm_layout[0] != self.window_width):
+                width = self.window_width
+                yes_padding = width // 2
+                no_start = yes_padding
+                no_padding = width - no_start - 1
+                self._confirm_layout = (
+                    width, yes_padding, self._t['yes'].center(yes_padding),
+                    no_start, no_padding, self._t['no'].center(no_padding))
+            (width, yes_padding, yes_text, no_start, no_padding,
+             no_text) = self._confirm_layout
             yes_start = 0
-            yes_padding = int(math.floor(self.window_width / 2))
-            yes_text = _('Yes').center(yes_padding)
-            no_start = yes_padding
-            no_padding = self.window_width - no_start - 1
-            no_text = _('No').center(no_padding)
 
             if confirm:
                 # Yes selected
-                yes_modifier = curses.A_BOLD | curses.A_REVERSE
+                yes_modifier = HIGHLIGHT
                 no_modifier = curses.A_NORMAL
             else:
                 # No selected
                 yes_modifier = curses.A_NORMAL
-                no_modifier = curses.A_BOLD | curses.A_REVERSE
+                no_modifier = HIGHLIGHT
 
             # Display Yes
             self._display(yes_text, x=yes_start, y=self.window_height - 1,
@@ -628,20 +859,18 @@ class Sentinel(object):
             key = self._display(
                 message, scroll=True, height=self.window_height - 1,
                 title=title)
+            upper_key = key.upper() if len(key) == 1 else key
 
             if key == '\n':
                 # Return key : Validate the choice
                 return confirm
-            elif (key == 'KEY_DOWN' or
-                  key == 'KEY_LEFT' or
-                  key == 'KEY_UP' or
-                  key == 'KEY_RIGHT'):
+            elif key in ('KEY_DOWN', 'KEY_LEFT', 'KEY_UP', 'KEY_RIGHT'):
                 # Arrow key : change value
                 confirm = not confirm
-            elif key.upper() == 'O' or key.upper() == 'Y':
+            elif upper_key in ('O', 'Y'):
                 # O (oui) or Y (yes)
                 confirm = True
-            elif key.upper() == 'N':
+            elif upper_key == 'N':
                 # N (No)
                 confirm = False
             elif key == 'KEY_MOUSE':
@@ -652,17 +881,25 @@ class Sentinel(object):
                 confirm = mouse_info[1] < len(yes_text)
 
                 # If we double clicked, auto-validate
-                if mouse_info[4] & curses.BUTTON1_DOUBLE_CLICKED:
+                if mouse_info[4] & DOUBLE_CLICK:
                     return confirm
             elif key == 'KEY_RESIZE':
                 self._set_screen_size()
+                self._confirm_layout = None
 
     def _input_text(self, message, default='', size=None, title=None):
         """
         Allows the user to input random text
         """
         # Initialize variables
-        value = default
+        # The characters are accumulated in a list, joined when returning
+        chars = list(default)
+        # Displayed form of each character of the value, kept up to date
+        # while typing to avoid rebuilding it on each key press
+        display_parts = [
+            curses.ascii.unctrl(char) if char != NULL_CHAR else ''
+            for char in chars]
+        full_display_value = ''.join(display_parts)
         line = self.window_height - 1
         self.screen.move(line, 0)
         # Flush the input
@@ -675,22 +912,18 @@ class Sentinel(object):
             self._display(clear=True)
 
             # Display the current value if echoing is needed
-            display_value = ''.join([
-                curses.ascii.unctrl(char)
-                for char in value
-                if char != NULL_CHAR
-            ])
-            display_start = max(0, len(display_value) - self.window_width + 1)
-            display_value = display_value[display_start:]
+            display_start = max(
+                0, len(full_display_value) - self.window_width + 1)
+            display_value = full_display_value[display_start:]
             self._display(' ' * (self.window_width - 1), 0, line)
             self._display(
                 display_value, 0, line, color='info', modifier=curses.A_BOLD)
             key = self._display(
                 message, scroll=True, height=self.window_height - 1,
-                cursor=(line, min(len(value), self.window_width - 1)),
+                cursor=(line, min(len(chars), self.window_width - 1)),
                 title=title)
 
-            # Printable character : store in value
+            # Printable character : store in the characters
             add_key = (
                 len(key) == 1 and
                 key != NULL_CHAR and
@@ -700,19 +933,26 @@ class Sentinel(object):
                 )
             )
             if add_key:
-                value += key
+                chars.append(key)
+                display_parts.append(curses.ascii.unctrl(key))
+                full_display_value += display_parts[-1]
             # Backspace or del, remove the last character
             elif key == 'KEY_BACKSPACE' or key == 'KEY_DC':
-                value = value[:-1]
+                if chars:
+                    chars.pop()
+                    removed = display_parts.pop()
+                    if removed:
+                        full_display_value = full_display_value[
+                            :-len(removed)]
             elif key == 'KEY_RESIZE':
                 self._set_screen_size()
                 line = self.window_height - 1
 
             # Move cursor at end of the displayed value
-            if key == '\n' or (size is not None and len(value) >= size):
+            if key == '\n' or (size is not None and len(chars) >= size):
                 # Flush the input
                 curses.flushinp()
-                return value.strip()
+                return ''.join(chars).strip()
 
     def _select_quantity(self, message, quantity='0', integer=False,
                          title=None):
@@ -727,9 +967,8 @@ class Sentinel(object):
             self._display(clear=True)
             # Diplays the selected quantity
             self._display(
-                _('Selected : %s') % quantity, y=self.window_height - 1,
+                self._t['selected'] % quantity, y=self.window_height - 1,
                 color='info', modifier=curses.A_BOLD)
-
             # Display the message and get the key
             key = self._display(
                 message, scroll=True, height=self.window_height - 1,
@@ -759,10 +998,10 @@ class Sentinel(object):
                 digit_key_pressed = True
             elif key == 'KEY_DOWN' or key == 'KEY_LEFT':
                 # Down key : Decrease
-                quantity = '%g' % (float(quantity) - 1)
+                quantity = f'{float(quantity) - 1:g}'
             elif key == 'KEY_UP' or key == 'KEY_RIGHT':
                 # Up key : Increase
-                quantity = '%g' % (float(quantity) + 1)
+                quantity = f'{float(quantity) + 1:g}'
             elif key == 'KEY_RESIZE':
                 self._set_screen_size()
 
@@ -780,128 +1019,198 @@ class Sentinel(object):
         elif isinstance(entries[0], (tuple, list)):
             keys, entries = list(zip(*entries))[:2]
 
-        # Highlighted entry
+        # Highlighted entry, kept in the list by the keys moving it
         highlighted = 0
+        nb_entries = len(entries)
         first_column = 0
-        max_length = max([len(value) for value in entries])
+        max_length = max(len(value) for value in entries)
 
         # Add line numbers before text
-        display = []
-        index = 0
-        nb_char = int(math.floor(math.log10(len(entries))) + 1)
+        nb_char = len(str(nb_entries))
         decal = nb_char + 3
-        for value in entries:
-            display.append(
-                '%s: %s' % (str(index).rjust(nb_char),
-                            value[:self.window_width - decal]))
-            index += 1
-
+        # Smallest index having as many digits as the last one
+        auto_validate_threshold = 10 ** (nb_char - 1)
+        # The line numbers never change, format them only once
+        prefixes = tuple(
+            f'{index:>{nb_char}}: ' for index in range(nb_entries))
+
+        # Bind the methods called on each key press to local names
+        has_pending_key = self._has_pending_key
+        menu_display = self._menu_display
+        getkey = self.getkey
+
+        skipped_redraws = 0
+        resize_pending = False
         while True:
-            # Display the menu
-            self._menu_display(display, highlighted, title=title)
+            # Resize the screen once the resize events have stopped
+            if resize_pending and (
+                    skipped_redraws >= MAX_SKIPPED_REDRAWS or
+                    not has_pending_key(RESIZE_DEBOUNCE_DELAY)):
+                self._set_screen_size()
+                # Repaint the whole menu
+                self._last_menu_entries = None
+                resize_pending = False
+
+            # Display the menu, unless other keys are already waiting, to
+            # handle key repeats before the next redraw
+            if (skipped_redraws < MAX_SKIPPED_REDRAWS and
+                    (resize_pending or has_pending_key())):
+                skipped_redraws += 1
+            else:
+                menu_display(
+                    entries, highlighted, title=title, prefixes=prefixes,
+                    first_column=first_column)
+                skipped_redraws = 0
 
             # Get the pushed key
-            key = self.getkey()
+            key = getkey()
             digit_key = False
 
-            if key == '\n':
-                # Return key : Validate the choice
-                return keys[highlighted]
+            # The most frequent keys (arrows, digits) are checked first
+            if key == 'KEY_DOWN':
+                # Down key : Go down in the list
+                highlighted = (highlighted + 1) % nb_entries
+            elif key == 'KEY_UP':
+                # Up key : Go up in the list
+                highlighted = (highlighted - 1) % nb_entries
             elif key.isdigit():
                 # Digit : Add at end of index
-                highlighted = highlighted * 10 + int(key)
+                highlighted = (highlighted * 10 + int(key)) % nb_entries
                 digit_key = True
+            elif key == '\n':
+                # Return key : Validate the choice
+                return keys[highlighted]
             elif key == 'KEY_BACKSPACE' or key == 'KEY_DC':
                 # Backspace : Remove last digit from index
-                highlighted = int(math.floor(highlighted / 10))
-            elif key == 'KEY_DOWN':
-                # Down key : Go down in the list
-                highlighted = highlighted + 1
+                highlighted = highlighted // 10
             elif key == 'KEY_RIGHT':
                 # Move display
                 first_column = max(
                     0, min(first_column + 1,
                            max_length - self.window_width + decal))
-                display = []
-                index = 0
-                for value in entries:
-                    display.append(
-                        '%s: %s' % (
-                            str(index).rjust(nb_char),
-                            value[first_column:
-                                  self.window_width - decal + first_column]))
-                    index += 1
-            elif key == 'KEY_UP':
-                # Up key : Go up in the list
-                highlighted = highlighted - 1
             elif key == 'KEY_LEFT':
                 # Move display
                 first_column = max(0, first_column - 1)
-                display = []
-                index = 0
-                for value in entries:
-                    display.append(
-                        '%s: %s' % (
-                            str(index).rjust(nb_char),
-                            value[first_column:
-                                  self.window_width - decal + first_column]))
-                    index += 1
             elif key == 'KEY_MOUSE':
                 # First line to be displayed
                 first_line = 0
-                nb_lines = self.window_height - 1
-                middle = int(math.floor(nb_lines / 2))
+                nb_lines = self._menu_lines
+                middle = self._menu_middle
 
                 # Change the first line if there is too much lines for the
                 # screen
-                if len(entries) > nb_lines and highlighted >= middle:
+                if nb_entries > nb_lines and highlighted >= middle:
                     first_line = min(highlighted - middle,
-                                     len(entries) - nb_lines)
+                                     nb_entries - nb_lines)
 
                 # Retrieve mouse event information
                 mouse_info = curses.getmouse()
 
                 # Set the selected entry
                 highlighted = min(max(0, first_line + mouse_info[2]),
-                                  len(entries) - 1)
+                                  nb_entries - 1)
 
                 # If we double clicked, auto-validate
-                if mouse_info[4] & curses.BUTTON1_DOUBLE_CLICKED:
+                if mouse_info[4] & DOUBLE_CLICK:
                     return keys[highlighted]
             elif key == 'KEY_RESIZE':
-                self._set_screen_size()
-
-            # Avoid going out of the list
-            highlighted %= len(entries)
+                # Terminals send many resize events while being resized
+                resize_pending = True
 
             # Auto validate if max number is reached
-            current_nb_char = int(
-                math.floor(math.log10(max(1, highlighted))) + 1)
-            if highlighted and digit_key and current_nb_char >= nb_char:
+            if digit_key and highlighted >= auto_validate_threshold:
                 return keys[highlighted]
 
-    def _menu_display(self, entries, highlighted, title=None):
+    def _menu_display(self, entries, highlighted, title=None, prefixes=None,
+                      first_column=0):
         """
         Display a menu, highlighting the selected entry
+        Only the visible part of the visible entries is built, after the
+        optional prefix of each entry (e.g. its line number)
         """
         # First line to be displayed
         first_line = 0
-        nb_lines = self.window_height - 1
+        nb_lines = self._menu_lines
         if len(entries) > nb_lines:
             nb_lines -= 1
-        middle = int(math.floor((nb_lines - 1) / 2))
-        # Change the first line if there is too much lines for the screen
-        if len(entries) > nb_lines and highlighted >= middle:
-            first_line = min(highlighted - middle, len(entries) - nb_lines)
-
-        # Display all entries, normal display
-        self._display('\n'.join(entries[first_line:first_line + nb_lines]),
-                      clear=True, title=title)
-        # Highlight selected entry
-        self._display(
-            entries[highlighted].ljust(self.window_width - 1),
-            y=highlighted - first_line,
-            modifier=curses.A_REVERSE | curses.A_BOLD, title=title)
+            middle = self._menu_scroll_middle
+            # Change the first line if there is too much lines for the screen
+            if highlighted >= middle:
+                first_line = min(
+                    highlighted - middle, len(entries) - nb_lines)
+
+        top = 0 if title is None else 1
+        width = self.window_width - 1
+        color = self._get_color('base')
+
+        # The rows are rendered in a pad, kept while the entries are
+        # unchanged, which is then copied to the screen from the first
+        # visible line
+        pad_height = min(len(entries), MAX_PAD_ROWS)
+        if (self._pad_key is None or self._pad_key[0] is not entries or
+                self._pad_key[1] != width):
+            self._pad = curses.newpad(pad_height + 1, self.window_width)
+            self._pad.bkgd(0, color)
+            self._pad.leaveok(True)
+            self._pad_key = (entries, width)
+            self._pad_column = first_column
+            self._pad_first = 0
+            self._pad_rows = set()
+            self._pad_highlighted = None
+        elif first_column != self._pad_column:
+            # Rows are rendered again when visible, overwriting the previous
+            # horizontal position
+            self._pad_column = first_column
+            self._pad_rows = set()
+
+        # Larger menus only keep a part of their rows in the pad, moved
+        # around the visible rows when they leave it
+        pad_first = self._pad_first
+        end_line = min(first_line + nb_lines, len(entries))
+        if first_line < pad_first or end_line > pad_first + pad_height:
+            pad_first = max(0, min(
+                first_line - (pad_height - nb_lines) // 2,
+                len(entries) - pad_height))
+            self._pad_first = pad_first
+            self._pad_rows = set()
+            self._pad_highlighted = None
+
+        # Render the rows which were never visible before
+        # All prefixes have the same length, the visible slice of the entries
+        # is the same for all rows
+        slice_end = first_column + width - (
+            len(prefixes[0]) if prefixes else 0)
+        for index in range(first_line, end_line):
+            if index not in self._pad_rows:
+                prefix = prefixes[index] if prefixes is not None else ''
+                row = (prefix + entries[index][first_column:slice_end]
+                       ).ljust(width)
+                self._pad.addstr(
+                    index - pad_first, 0, row.encode(encoding), color)
+                self._pad_rows.add(index)
+
+        # Move the highlight to the selected entry
+        if self._pad_highlighted is not None:
+            self._pad.chgat(self._pad_highlighted - pad_first, 0, width, color)
+        self._pad.chgat(
+            highlighted - pad_first, 0, width, color | HIGHLIGHT)
+        self._pad_highlighted = highlighted
+
+        layout = (title, first_line, self.window_width, self.window_height)
+        if (entries is self._last_menu_entries and
+                layout == self._last_menu_layout and
+                (not top or self._last_menu_position != 0)):
+            # Same screen around the entries : erase the previous scroll
+            # position
+            # A position drawn over the title needs the title to be redrawn,
+            # which is done by the full display below
+            if self._last_menu_position is not None:
+                self.screen.addch(
+                    self._last_menu_position, self.window_width - 1, ' ',
+                    color)
+        else:
+            # Clear the screen and display the title, if any
+            self._display(clear=True, title=title)
 
         # Display arrows
         if first_line > 0:
@@ -911,18 +1220,36 @@ class Sentinel(object):
                 nb_lines, self.window_width - 1, curses.ACS_DARROW)
 
         # Diplays number of the selected entry
-        self._display(_('Selected : %d') % highlighted, y=self.window_height-1,
-                      color='info', modifier=curses.A_BOLD)
+        self._display((self._t['selected_index'] % highlighted).ljust(width),
+                      y=self.window_height - 1, color='info',
+                      modifier=curses.A_BOLD)
 
         # Set the cursor position
+        position = None
         if nb_lines < len(entries):
-            position_percent = float(highlighted) / len(entries)
-            position = int(round(nb_lines * position_percent))
+            position = (
+                (highlighted * nb_lines + len(entries) // 2) // len(entries))
             self._display(
                 ' ', x=self.window_width - 1, y=position, color='info',
                 modifier=curses.A_REVERSE)
+
+        # Store what is displayed, for the next call
+        self._last_menu_entries = entries
+        self._last_menu_layout = layout
+        self._last_menu_position = position
         self.screen.move(self.window_height - 1, self.window_width - 1)
 
+        # Copy the screen, then the visible rows over it, and send all the
+        # changes to the terminal at once
+        self.screen.noutrefresh()
+        last_row = min(
+            top + min(nb_lines, len(entries) - first_line),
+            self.window_height - 1) - 1
+        if last_row >= top:
+            self._pad.noutrefresh(
+                first_line - pad_first, 0, top, 0, last_row, width - 1)
+        curses.doupdate()
+
 
 class SentinelException (Exception):
     pass